@@ -0,0 +1,19 @@
+"""Application settings, read once from the environment and `.env`."""
+
+from pathlib import Path
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """App configuration (env vars override values from `.env`)."""
+
+    # Project-root .env, independent of the working directory
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).resolve().parent.parent / ".env", extra="ignore"
+    )
+
+    repo_type: str = "memory"
+
+
+settings = Settings()
@@ -1,8 +1,9 @@
 """SQLAlchemy database models and setup."""
 
-from datetime import datetime
+from datetime import UTC, datetime
+from functools import cache
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Index, String, TypeDecorator, event, func
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -11,23 +12,81 @@ class Base(DeclarativeBase):
     pass
 
 
+class UTCDateTime(TypeDecorator):
+    """DateTime stored as naive UTC (SQLite has no timezone) and loaded as aware UTC."""
+
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return value.replace(tzinfo=UTC) if value is not None else None
+
+
 class UserModel(Base):
     """SQLAlchemy User model."""
 
     __tablename__ = "users"
+    # Fetch SQL-generated created_at via RETURNING on insert, so no refresh is needed
+    __mapper_args__ = {"eager_defaults": True}
+    # Covers lookups by username so email/created_at come from the index, not the table
+    __table_args__ = (Index("ix_users_username_covering", "username", "email", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     email: Mapped[str] = mapped_column(String(100), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    # default renders CURRENT_TIMESTAMP in the INSERT itself, so tables created before
+    # server_default existed still get a value
+    created_at: Mapped[datetime] = mapped_column(
+        UTCDateTime, default=func.now(), server_default=func.now()
+    )
 
 
+SQLITE_PRAGMAS = (
+    # busy_timeout first, so the journal_mode switch waits out a concurrent connection
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=134217728",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune every new SQLite connection (WAL lets readers and writers run concurrently)."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+@cache
 def get_async_engine(db_path: str = "users.db"):
-    """Create async SQLite engine."""
-    return create_async_engine(f"sqlite+aiosqlite:///{db_path}", echo=False)
+    """Create async SQLite engine (one shared engine and pool per database path)."""
+    if db_path == ":memory:":
+        # In-memory databases use a single static connection and keep the default journal
+        return create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        echo=False,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
 
 
+@cache
 def get_session_maker(db_path: str = "users.db") -> async_sessionmaker[AsyncSession]:
-    """Create async session maker."""
+    """Create async session maker bound to the shared engine."""
     engine = get_async_engine(db_path)
     return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
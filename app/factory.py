@@ -1,24 +1,41 @@
 """Factory function for User Repositories."""
 
-import os
-
-from dotenv import load_dotenv
+from collections.abc import Callable
+from functools import cache
 
+from app.config import settings
 from app.repository import InMemoryUserRepository, SQLiteUserRepository, UserRepository
 
-load_dotenv()
+_REGISTRY: dict[str, Callable[[], UserRepository]] = {
+    "memory": InMemoryUserRepository,
+    "sqlite": SQLiteUserRepository,
+}
+
+
+def register(name: str, cls: Callable[[], UserRepository]) -> None:
+    """Register an additional repository implementation under the given name."""
+    _REGISTRY[name.lower()] = cls
+    _make_cached.cache_clear()
+
+
+def _make(repo_type: str) -> UserRepository:
+    factory = _REGISTRY.get(repo_type)
+    if factory is None:
+        options = ", ".join(f"'{name}'" for name in _REGISTRY)
+        raise ValueError(f"Unknown repository type: {repo_type}. Use {options}")
+    return factory()
 
 
-def create_user_repository(repo_type: str | None = None) -> UserRepository:
-    """Factory function to create the appropriate UserRepository."""
+_make_cached = cache(_make)
+
+
+def create_user_repository(repo_type: str | None = None, *, cached: bool = True) -> UserRepository:
+    """Factory function to create the appropriate UserRepository.
+
+    Repeated calls return the same instance; pass cached=False to get a new one.
+    """
     if repo_type is None:
-        repo_type = os.getenv("REPO_TYPE", "memory")
+        repo_type = settings.repo_type
 
     repo_type = repo_type.lower()
-
-    if repo_type == "memory":
-        return InMemoryUserRepository()
-    elif repo_type == "sqlite":
-        return SQLiteUserRepository()
-    else:
-        raise ValueError(f"Unknown repository type: {repo_type}. Use 'memory' or 'sqlite'")
+    return _make_cached(repo_type) if cached else _make(repo_type)
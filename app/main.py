@@ -1,31 +1,53 @@
 """FastAPI User Registration - Factory Pattern Demo."""
 
-import os
+import logging
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Annotated
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.factory import create_user_repository
 from app.models import User, UserCreate
 from app.repository import UserRepository
 
-load_dotenv()
-repo_type = os.getenv("REPO_TYPE", "memory")
-repo: UserRepository = create_user_repository()
+logging.basicConfig(level=logging.INFO)
 
 
+def get_repo(request: Request) -> UserRepository:
+    """Repository created in lifespan, inside the running event loop."""
+    return request.app.state.repo
+
+
+RepoDep = Annotated[UserRepository, Depends(get_repo)]
+
+
+async def get_session(repo: RepoDep) -> AsyncIterator[AsyncSession | None]:
+    """One session (one pooled connection) per HTTP request."""
+    async with repo.session() as session:
+        yield session
+
+
+SessionDep = Annotated[AsyncSession | None, Depends(get_session)]
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown events."""
+    # A new instance per lifespan, so no state or pooled connections outlive an event loop
+    repo = create_user_repository(cached=False)
+    await repo.startup()
+    app.state.repo = repo
     print(f"\n{'=' * 60}")
-    print(f"FastAPI server started with: {repo_type.upper()} Repository")
+    print(f"FastAPI server started with: {settings.repo_type.upper()} Repository")
     print(f"{'=' * 60}")
     print("\n[!] API is ready!")
     print(f"[*] Using: {repo.__class__.__name__}")
     print("[i] Tip: Change REPO_TYPE in .env to switch implementations\n")
     yield
+    await repo.shutdown()
 
 
 app = FastAPI(
@@ -41,9 +63,10 @@ async def root():
     """Welcome endpoint with current repository info."""
     return {
         "message": "User Registration API - Factory Pattern Demo",
-        "repository_type": repo_type,
+        "repository_type": settings.repo_type,
         "endpoints": {
             "POST /users/": "Register new user",
+            "POST /users/bulk": "Register many users in one transaction",
             "GET /users/": "List all users",
             "GET /users/{user_id}": "Get specific user",
         },
@@ -51,26 +74,35 @@ async def root():
 
 
 @app.post("/users/", response_model=User, status_code=201)
-async def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate, repo: RepoDep, session: SessionDep):
     """Register a new user."""
     user = await repo.create_user(
         username=user_data.username,
         email=user_data.email,
+        session=session,
     )
     return user
 
 
+@app.post("/users/bulk", response_model=list[User], status_code=201)
+async def register_users(users_data: list[UserCreate], repo: RepoDep, session: SessionDep):
+    """Register several users at once."""
+    users = await repo.create_users(users_data, session=session)
+    return users
+
+
 @app.get("/users/", response_model=list[User])
-async def list_users():
+async def list_users(repo: RepoDep, session: SessionDep):
     """List all registered users."""
-    users = await repo.list_users()
-    return users
+    content = await repo.list_users_json(session=session)
+    # Returning a response directly skips the second validation pass against response_model
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/users/{user_id}", response_model=User)
-async def get_user(user_id: int):
+async def get_user(user_id: int, repo: RepoDep, session: SessionDep):
     """Get a specific user by ID."""
-    user = await repo.get_user(user_id)
+    user = await repo.get_user(user_id, session=session)
     if user is None:
         raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
     return user
@@ -1,21 +1,43 @@
 """Pydantic models for User API."""
 
+import re
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, field_validator
+
+# Compiled once at import; far cheaper per request than email-validator's full RFC checks
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
 
 
 class UserCreate(BaseModel):
     """User creation request schema."""
 
+    model_config = ConfigDict(
+        extra="ignore", validate_default=False, str_strip_whitespace=False, frozen=False
+    )
+
     username: str
-    email: EmailStr
+    email: str
+
+    @field_validator("email")
+    @classmethod
+    def check_email(cls, value: str) -> str:
+        if EMAIL_PATTERN.fullmatch(value) is None:
+            raise ValueError("value is not a valid email address")
+        return value
 
 
 class User(BaseModel):
     """User response model."""
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra="ignore",
+        validate_default=False,
+        validate_assignment=False,
+        str_strip_whitespace=False,
+        frozen=False,
+    )
 
     id: int
     username: str
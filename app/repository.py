@@ -1,118 +1,234 @@
 """User Repository - ABC Interface with InMemory and SQLite implementations."""
 
 import asyncio
+import itertools
+import logging
 from abc import ABC, abstractmethod
-from datetime import datetime
+from collections.abc import AsyncIterator, Sequence
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from datetime import UTC, datetime
 
-from sqlalchemy import select
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import Base, UserModel, get_async_engine, get_session_maker
-from app.models import User
+from app.models import User, UserCreate
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository(ABC):
     """Abstract base class for all User Repository implementations."""
 
+    async def startup(self) -> None:
+        """One-time setup, called from the app lifespan before serving requests."""
+        return
+
+    async def shutdown(self) -> None:
+        """Release resources, called from the app lifespan after serving requests."""
+        return
+
+    def session(self) -> AbstractAsyncContextManager[AsyncSession | None]:
+        """Open a session shared by all calls of one HTTP request (None if not needed)."""
+        return nullcontext()
+
+    @abstractmethod
+    async def create_user(
+        self, username: str, email: str, session: AsyncSession | None = None
+    ) -> User:
+        pass
+
     @abstractmethod
-    async def create_user(self, username: str, email: str) -> User:
+    async def create_users(
+        self, items: list[UserCreate], session: AsyncSession | None = None
+    ) -> list[User]:
         pass
 
     @abstractmethod
-    async def get_user(self, user_id: int) -> User | None:
+    async def get_user(self, user_id: int, session: AsyncSession | None = None) -> User | None:
         pass
 
     @abstractmethod
-    async def list_users(self) -> list[User]:
+    async def list_users(self, session: AsyncSession | None = None) -> Sequence[User]:
         pass
 
+    async def list_users_json(self, session: AsyncSession | None = None) -> bytes:
+        """All users serialized as a JSON array."""
+        users = await self.list_users(session=session)
+        return orjson.dumps([user.model_dump(mode="json") for user in users])
+
 
 class InMemoryUserRepository(UserRepository):
     """In-memory user storage."""
 
     def __init__(self):
         self._users: dict[int, User] = {}
-        self._next_id: int = 1
-        self._lock = asyncio.Lock()
-        print("[OK] InMemoryUserRepository initialized")
-
-    async def create_user(self, username: str, email: str) -> User:
-        async with self._lock:
-            user = User(
-                id=self._next_id,
-                username=username,
-                email=email,
-                created_at=datetime.now(),
-            )
-            self._users[user.id] = user
-            self._next_id += 1
-            print(f"  > Created user (memory): {user.username} (ID: {user.id})")
-            return user
+        # next() on a count is atomic, so concurrent inserts need no lock
+        self._next_id = itertools.count(1)
+        # Snapshots for list_users / list_users_json, rebuilt only after a write
+        self._users_snapshot: tuple[User, ...] | None = None
+        self._users_json: bytes | None = None
+        logger.info("InMemoryUserRepository initialized")
+
+    async def create_user(
+        self, username: str, email: str, session: AsyncSession | None = None
+    ) -> User:
+        user = User(
+            id=next(self._next_id),
+            username=username,
+            email=email,
+            created_at=datetime.now(UTC),
+        )
+        self._users[user.id] = user
+        self._invalidate_cache()
+        logger.debug("Created user (memory): %s (ID: %s)", user.username, user.id)
+        return user
 
-    async def get_user(self, user_id: int) -> User | None:
+    async def create_users(
+        self, items: list[UserCreate], session: AsyncSession | None = None
+    ) -> list[User]:
+        now = datetime.now(UTC)
+        users = [
+            User(id=next(self._next_id), username=item.username, email=item.email, created_at=now)
+            for item in items
+        ]
+        self._users.update((user.id, user) for user in users)
+        self._invalidate_cache()
+        logger.debug("Created %s user(s) (memory)", len(users))
+        return users
+
+    async def get_user(self, user_id: int, session: AsyncSession | None = None) -> User | None:
         user = self._users.get(user_id)
-        print(f"  > Get user (memory): ID {user_id} > {user.username if user else 'Not found'}")
+        logger.debug("Get user (memory): ID %s > %s", user_id, user.username if user else None)
         return user
 
-    async def list_users(self) -> list[User]:
-        users = list(self._users.values())
-        print(f"  > Listed {len(users)} user(s) from memory")
+    async def list_users(self, session: AsyncSession | None = None) -> Sequence[User]:
+        users = self._users_snapshot
+        if users is None:
+            users = self._users_snapshot = tuple(self._users.values())
+        logger.debug("Listed %s user(s) from memory", len(users))
         return users
 
+    async def list_users_json(self, session: AsyncSession | None = None) -> bytes:
+        # Rebuilt without awaiting, so concurrent readers never recompute it twice
+        if self._users_json is None:
+            users = self._users.values()
+            self._users_json = orjson.dumps([user.model_dump(mode="json") for user in users])
+        return self._users_json
+
+    def _invalidate_cache(self) -> None:
+        self._users_snapshot = None
+        self._users_json = None
+
 
 class SQLiteUserRepository(UserRepository):
     """SQLite database user storage using SQLAlchemy ORM."""
 
     def __init__(self, db_path: str = "users.db"):
         self.db_path = db_path
+        self.engine = get_async_engine(db_path)
         self.session_maker = get_session_maker(db_path)
-        self._initialized = False
-        print(f"[OK] SQLiteUserRepository initialized (DB: {db_path})")
+        logger.info("SQLiteUserRepository initialized (DB: %s)", db_path)
 
-    async def _init_db(self):
-        if self._initialized:
-            return
+    async def startup(self) -> None:
+        # Independent setup steps, each on its own pooled connection
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self._warm_up())
+            tg.create_task(self._create_schema())
+
+    async def shutdown(self) -> None:
+        # Close pooled connections; the shared engine reopens them on the next event loop
+        await self.engine.dispose()
+
+    async def _warm_up(self) -> None:
+        # Opening a connection runs the connect-time PRAGMAs before the first request
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
 
-        engine = get_async_engine(self.db_path)
-        async with engine.begin() as conn:
+    async def _create_schema(self) -> None:
+        async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
-        self._initialized = True
+            # create_all skips tables that already exist, so add indexes added later explicitly
+            for index in UserModel.__table__.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
 
-    async def create_user(self, username: str, email: str) -> User:
-        await self._init_db()
+    def session(self) -> AbstractAsyncContextManager[AsyncSession]:
+        return self.session_maker()
 
-        async with self.session_maker() as session:
+    @asynccontextmanager
+    async def _session_scope(self, session: AsyncSession | None) -> AsyncIterator[AsyncSession]:
+        if session is not None:
+            yield session
+            return
+        async with self.session_maker() as own_session:
+            yield own_session
+
+    async def create_user(
+        self, username: str, email: str, session: AsyncSession | None = None
+    ) -> User:
+        async with self._session_scope(session) as session:
             db_user = UserModel(username=username, email=email)
             session.add(db_user)
             await session.commit()
-            await session.refresh(db_user)
 
             user = User.model_validate(db_user)
-            print(f"  > Created user (SQLite): {user.username} (ID: {user.id})")
+            logger.debug("Created user (SQLite): %s (ID: %s)", user.username, user.id)
             return user
 
-    async def get_user(self, user_id: int) -> User | None:
-        await self._init_db()
-
-        async with self.session_maker() as session:
-            result = await session.execute(select(UserModel).where(UserModel.id == user_id))
-            db_user = result.scalar_one_or_none()
+    async def create_users(
+        self, items: list[UserCreate], session: AsyncSession | None = None
+    ) -> list[User]:
+        async with self._session_scope(session) as session:
+            db_users = [UserModel(username=item.username, email=item.email) for item in items]
+            # One transaction for the whole batch; IDs come back from the flush, no refresh
+            session.add_all(db_users)
+            await session.commit()
+            # Refresh planner statistics after a batch load (cheap no-op when nothing changed),
+            # in its own short transaction so the insert does not hold the writer lock for it
+            await session.execute(text("PRAGMA optimize"))
+            await session.commit()
 
-            if db_user:
-                user = User.model_validate(db_user)
-                print(f"  > Get user (SQLite): ID {user_id} > {user.username}")
+            users = [User.model_validate(db_user) for db_user in db_users]
+            logger.debug("Created %s user(s) (SQLite)", len(users))
+            return users
+
+    async def get_user(self, user_id: int, session: AsyncSession | None = None) -> User | None:
+        async with self._session_scope(session) as session:
+            # Read-only PK lookup: plain driver tuple, no ORM hydration or identity map
+            conn = await session.connection()
+            result = await conn.exec_driver_sql(
+                "SELECT id, username, email, created_at FROM users WHERE id = ?", (user_id,)
+            )
+            row = result.fetchone()
+
+            if row:
+                user = User.model_construct(
+                    id=row[0],
+                    username=row[1],
+                    email=row[2],
+                    # Raw driver value: naive UTC text, see UTCDateTime
+                    created_at=datetime.fromisoformat(row[3]).replace(tzinfo=UTC),
+                )
+                logger.debug("Get user (SQLite): ID %s > %s", user_id, user.username)
                 return user
 
-        print(f"  > User not found (SQLite): ID {user_id}")
+        logger.debug("User not found (SQLite): ID %s", user_id)
         return None
 
-    async def list_users(self) -> list[User]:
-        await self._init_db()
-
-        async with self.session_maker() as session:
-            result = await session.execute(select(UserModel).order_by(UserModel.id))
-            db_users = result.scalars().all()
+    async def list_users(self, session: AsyncSession | None = None) -> list[User]:
+        async with self._session_scope(session) as session:
+            result = await session.execute(
+                select(
+                    UserModel.id, UserModel.username, UserModel.email, UserModel.created_at
+                ).order_by(UserModel.id)
+            )
 
-            users = [User.model_validate(db_user) for db_user in db_users]
+            # Rows come straight from the DB, so skip Pydantic validation
+            users = [
+                User.model_construct(id=r[0], username=r[1], email=r[2], created_at=r[3])
+                for r in result.all()
+            ]
 
-        print(f"  > Listed {len(users)} user(s) from SQLite")
+        logger.debug("Listed %s user(s) from SQLite", len(users))
         return users
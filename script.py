@@ -1,8 +1,12 @@
 """Simple Factory Pattern Example - DataStore Implementations"""
 
-import json
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+
+import orjson
 
 
 class DataStore(ABC):
@@ -21,7 +25,7 @@ class DataStore(ABC):
         pass
 
     @abstractmethod
-    def list_all(self) -> dict[str, str]:
+    def list_all(self) -> Mapping[str, str]:
         pass
 
 
@@ -48,31 +52,105 @@ class InMemoryStore(DataStore):
             return True
         return False
 
-    def list_all(self) -> dict[str, str]:
-        return self._data.copy()
+    def list_all(self) -> Mapping[str, str]:
+        # Read-only live view, no copy
+        return MappingProxyType(self._data)
 
 
 class FileStore(DataStore):
-    """Persistent storage using JSON file."""
-
-    def __init__(self, filename: str = "data.json"):
+    """Persistent storage using a JSON snapshot plus an append-only change log."""
+
+    def __init__(
+        self,
+        filename: str = "data.json",
+        debug: bool = False,
+        fsync: bool = False,
+        compact_every: int = 1000,
+    ):
         self.filename = Path(filename)
+        self.log_filename = self.filename.with_suffix(".log")
+        self.debug = debug
+        self.fsync = fsync
+        self.compact_every = compact_every
         self._data: dict[str, str] = {}
+        self._log_entries = 0
         self._load()
+        self._log = open(self.log_filename, "ab")
         print(f"[OK] FileStore initialized (file: {filename})")
 
     def _load(self) -> None:
-        if self.filename.exists():
-            with open(self.filename, encoding="utf-8") as f:
-                self._data = json.load(f)
+        # Read raw bytes straight into orjson; a missing file is the only "exists" check
+        try:
+            self._data = orjson.loads(self.filename.read_bytes())
+        except FileNotFoundError:
+            pass
+        try:
+            log = self.log_filename.read_bytes()
+        except FileNotFoundError:
+            return
+        good = 0  # byte offset just past the last intact entry
+        for line in log.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # torn last line from a crash mid-append
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                break
+            if entry["op"] == "put":
+                self._data[entry["k"]] = entry["v"]
+            else:
+                self._data.pop(entry["k"], None)
+            self._log_entries += 1
+            good += len(line)
+        if good < len(log):
+            # Cut the torn tail, otherwise the next append would be glued onto it
+            os.truncate(self.log_filename, good)
+
+    def _append(self, entry: dict[str, str]) -> None:
+        # One small sequential append per update instead of rewriting the whole file
+        self._log.write(orjson.dumps(entry) + b"\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._log_entries += 1
+        if self._log_entries >= self.compact_every:
+            self.compact()
+
+    def close(self) -> None:
+        """Close the change log file."""
+        self._log.close()
+
+    def compact(self) -> None:
+        """Write a fresh snapshot and truncate the change log."""
+        self._save_to_file()
+        self._log.truncate(0)
+        self._log_entries = 0
 
     def _save_to_file(self) -> None:
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        # Write a sibling temp file and rename it over the original, so a crash never
+        # leaves a half-written data file behind
+        tmp = self.filename.with_name(self.filename.name + ".tmp")
+        payload = orjson.dumps(self._data, option=orjson.OPT_INDENT_2 if self.debug else 0)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # os.write may write only part of the buffer, so loop until all of it is out
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, self.filename)
+        # fsync the directory too, so the rename is durable before compact() truncates the log
+        dir_fd = os.open(self.filename.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
     def save(self, key: str, value: str) -> None:
         self._data[key] = value
-        self._save_to_file()
+        self._append({"op": "put", "k": key, "v": value})
         print(f"  > Saved to file: {key} = {value}")
 
     def get(self, key: str) -> str | None:
@@ -83,13 +161,14 @@ class FileStore(DataStore):
     def delete(self, key: str) -> bool:
         if key in self._data:
             del self._data[key]
-            self._save_to_file()
+            self._append({"op": "del", "k": key})
             print(f"  > Deleted from file: {key}")
             return True
         return False
 
-    def list_all(self) -> dict[str, str]:
-        return self._data.copy()
+    def list_all(self) -> Mapping[str, str]:
+        # Read-only live view, no copy
+        return MappingProxyType(self._data)
 
 
 def create_data_store(store_type: str) -> DataStore:
@@ -136,6 +215,8 @@ def main():
 
     file_store = create_data_store("file")
     demo_store(file_store, "FileStore")
+    file_store.compact()
+    file_store.close()
 
     print("\n" + "=" * 60)
     print("DONE! Check out the data.json file.")